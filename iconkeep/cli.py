@@ -1,15 +1,18 @@
 from __future__ import annotations
 
-import argparse
+import functools
 import json
-import plistlib
 import shutil
+import struct
 import sys
 import os
-from dataclasses import asdict, dataclass
-from datetime import datetime
+import threading
+from dataclasses import dataclass, fields
 from pathlib import Path
-from typing import Iterable
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, TextIO
+
+if TYPE_CHECKING:
+    import argparse
 
 APP_SEARCH_DIRS = [
     Path("/Applications"),
@@ -18,11 +21,27 @@ APP_SEARCH_DIRS = [
 ]
 
 
+BPLIST_MAGIC = b"bplist00"
+
+INFO_PLIST_KEYS = frozenset(
+    {
+        "CFBundleIdentifier",
+        "CFBundleName",
+        "CFBundleIconFile",
+        "CFBundleIconFiles",
+        "CFBundleIcons",
+    }
+)
+
+_OUTPUT_LOCK = threading.Lock()
+_PATH_EXISTS: dict[str, bool] = {}
+
+
 class IconkeepError(Exception):
     pass
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class BackupRecord:
     app_path: str
     bundle_id: str | None
@@ -32,22 +51,52 @@ class BackupRecord:
     timestamp: str
 
 
+_RECORD_FIELDS = tuple(field.name for field in fields(BackupRecord))
+
+
+def _emit(message: str, file: TextIO | None = None) -> None:
+    with _OUTPUT_LOCK:
+        print(message, file=file)
+
+
+def _exists(path: Path) -> bool:
+    key = os.fspath(path)
+    exists = _PATH_EXISTS.get(key)
+    if exists is None:
+        exists = _PATH_EXISTS[key] = os.path.exists(key)
+    return exists
+
+
+def _ensure_dir(path: Path) -> None:
+    try:
+        os.mkdir(path)
+    except FileExistsError:
+        if not path.is_dir():
+            raise
+    except FileNotFoundError:
+        path.mkdir(parents=True, exist_ok=True)
+
+
 def _xdg_dir(env_var: str, default: Path) -> Path:
     return Path(os.environ.get(env_var, default)).expanduser()
 
 
+@functools.lru_cache(maxsize=1)
 def data_dir() -> Path:
     return _xdg_dir("XDG_DATA_HOME", Path.home() / ".local" / "share") / "iconkeep" / "backups"
 
 
+@functools.lru_cache(maxsize=1)
 def cache_dir() -> Path:
     return _xdg_dir("XDG_CACHE_HOME", Path.home() / ".cache") / "iconkeep"
 
 
+@functools.lru_cache(maxsize=1)
 def state_dir() -> Path:
     return _xdg_dir("XDG_STATE_HOME", Path.home() / ".local" / "state") / "iconkeep"
 
 
+@functools.lru_cache(maxsize=1)
 def config_dir() -> Path:
     return _xdg_dir("XDG_CONFIG_HOME", Path.home() / ".config") / "iconkeep"
 
@@ -71,9 +120,41 @@ def load_app_list() -> list[str]:
 
 
 def normalize_app_name(name: str) -> str:
-    if name.lower().endswith(".app"):
+    name = name.casefold()
+    if name.endswith(".app"):
         name = name[:-4]
-    return name.strip().lower()
+    return name.strip()
+
+
+def _scan_app_bundles(root: Path, depth: int = 1) -> Iterator[Path]:
+    try:
+        entries = list(os.scandir(root))
+    except (FileNotFoundError, NotADirectoryError, PermissionError):
+        return
+
+    subdirs: list[Path] = []
+    for entry in entries:
+        if entry.name.endswith(".app"):
+            if entry.is_dir():
+                yield Path(entry.path)
+        elif (
+            depth > 0
+            and not entry.name.startswith(".")
+            and entry.is_dir(follow_symlinks=False)
+        ):
+            subdirs.append(Path(entry.path))
+
+    for subdir in subdirs:
+        yield from _scan_app_bundles(subdir, depth - 1)
+
+
+@functools.lru_cache(maxsize=1)
+def _app_index() -> dict[str, Path]:
+    index: dict[str, Path] = {}
+    for root in APP_SEARCH_DIRS:
+        for app in _scan_app_bundles(root):
+            index.setdefault(normalize_app_name(app.name), app)
+    return index
 
 
 def find_app_bundle(app_name: str) -> Path:
@@ -86,34 +167,106 @@ def find_app_bundle(app_name: str) -> Path:
                 return parent
         raise IconkeepError(f"{app_name!r} exists but is not inside an .app bundle")
 
-    target = normalize_app_name(app_name)
-    for root in APP_SEARCH_DIRS:
-        if not root.exists():
-            continue
-        for app in root.rglob("*.app"):
-            if normalize_app_name(app.name) == target:
-                return app
+    app = _app_index().get(normalize_app_name(app_name))
+    if app is not None:
+        return app
     raise IconkeepError(f"Could not find app bundle for {app_name!r}")
 
 
-def read_info_plist(app_path: Path) -> dict:
-    plist_path = app_path / "Contents" / "Info.plist"
-    if not plist_path.exists():
-        raise IconkeepError(f"Missing Info.plist at {plist_path}")
-    with plist_path.open("rb") as handle:
-        return plistlib.load(handle)
+def _read_bplist_keys(data: bytes, keys: frozenset[str]) -> dict:
+    offset_size, ref_size, _, top_object, table_offset = struct.unpack(">6xBBQQQ", data[-32:])
+
+    def read_int(pos: int, size: int) -> int:
+        return int.from_bytes(data[pos : pos + size], "big")
+
+    def read_count(pos: int, info: int) -> tuple[int, int]:
+        if info != 0xF:
+            return info, pos
+        size = 1 << (data[pos] & 0xF)
+        return read_int(pos + 1, size), pos + 1 + size
+
+    def read_refs(pos: int, count: int) -> list[int]:
+        return [read_int(pos + i * ref_size, ref_size) for i in range(count)]
+
+    def read_dict_refs(pos: int, info: int) -> tuple[list[int], list[int]]:
+        count, pos = read_count(pos, info)
+        return read_refs(pos, count), read_refs(pos + count * ref_size, count)
+
+    def read_object(ref: int) -> object:
+        pos = read_int(table_offset + ref * offset_size, offset_size)
+        marker = data[pos]
+        kind, info = marker >> 4, marker & 0xF
+        pos += 1
+        if marker == 0x00:
+            return None
+        if marker in (0x08, 0x09):
+            return marker == 0x09
+        if kind == 0x1:
+            size = 1 << info
+            return int.from_bytes(data[pos : pos + size], "big", signed=size >= 8)
+        if kind == 0x5:
+            count, pos = read_count(pos, info)
+            return data[pos : pos + count].decode("ascii")
+        if kind == 0x6:
+            count, pos = read_count(pos, info)
+            return data[pos : pos + 2 * count].decode("utf-16be")
+        if kind == 0xA:
+            count, pos = read_count(pos, info)
+            return [read_object(item) for item in read_refs(pos, count)]
+        if kind == 0xD:
+            key_refs, value_refs = read_dict_refs(pos, info)
+            return {read_object(k): read_object(v) for k, v in zip(key_refs, value_refs)}
+        raise ValueError(f"Unsupported binary plist marker {marker:#04x}")
+
+    root = read_int(table_offset + top_object * offset_size, offset_size)
+    if data[root] >> 4 != 0xD:
+        raise ValueError("Binary plist root is not a dictionary")
+    key_refs, value_refs = read_dict_refs(root + 1, data[root] & 0xF)
+
+    result: dict = {}
+    for key_ref, value_ref in zip(key_refs, value_refs):
+        key = read_object(key_ref)
+        if key in keys:
+            result[key] = read_object(value_ref)
+    return result
 
 
-def _icon_candidates(info: dict) -> Iterable[str]:
-    icon_file = info.get("CFBundleIconFile")
-    if icon_file:
-        yield icon_file
+def read_info_plist(app_path: Path) -> dict:
+    plist_path = app_path / "Contents" / "Info.plist"
+    try:
+        fd = os.open(plist_path, os.O_RDONLY)
+    except (FileNotFoundError, NotADirectoryError):
+        raise IconkeepError(f"Missing Info.plist at {plist_path}") from None
+    try:
+        size = os.fstat(fd).st_size
+        chunks: list[bytes] = []
+        remaining = size
+        while remaining > 0:
+            chunk = os.read(fd, remaining)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        data = b"".join(chunks)
+    finally:
+        os.close(fd)
+    if data.startswith(BPLIST_MAGIC):
+        try:
+            return _read_bplist_keys(data, INFO_PLIST_KEYS)
+        except (ValueError, IndexError, TypeError, struct.error, RecursionError):
+            pass
+    import plistlib
+
+    info = plistlib.loads(data)
+    return {key: value for key, value in info.items() if key in INFO_PLIST_KEYS}
+
+
+def _icon_candidates(info: dict) -> list[str]:
+    entries: list = [info.get("CFBundleIconFile")]
 
     icon_files = info.get("CFBundleIconFiles")
     if isinstance(icon_files, list):
-        for entry in icon_files:
-            if entry:
-                yield entry
+        entries.extend(icon_files)
 
     icons = info.get("CFBundleIcons")
     if isinstance(icons, dict):
@@ -121,23 +274,35 @@ def _icon_candidates(info: dict) -> Iterable[str]:
         if isinstance(primary, dict):
             primary_files = primary.get("CFBundleIconFiles")
             if isinstance(primary_files, list):
-                for entry in primary_files:
-                    if entry:
-                        yield entry
+                entries.extend(primary_files)
+
+    candidates: list[str] = []
+    seen: set[str] = set()
+    for entry in entries:
+        if entry and entry not in seen:
+            seen.add(entry)
+            candidates.append(entry)
+    return candidates
 
 
 def resolve_icon_path(app_path: Path, info: dict) -> Path:
     resources = app_path / "Contents" / "Resources"
+    try:
+        with os.scandir(resources) as entries:
+            names = {entry.name for entry in entries}
+    except (FileNotFoundError, NotADirectoryError):
+        names = set()
+
     for candidate in _icon_candidates(info):
+        if Path(candidate).suffix == "":
+            candidate += ".icns"
         candidate_path = resources / candidate
-        if candidate_path.suffix == "":
-            candidate_path = candidate_path.with_suffix(".icns")
-        if candidate_path.exists():
+        if candidate in names or (names and candidate_path.exists()):
             return candidate_path
 
-    icns_files = sorted(resources.glob("*.icns")) if resources.exists() else []
-    if icns_files:
-        return icns_files[0]
+    fallback = min((name for name in names if name.endswith(".icns")), default=None)
+    if fallback is not None:
+        return resources / fallback
 
     raise IconkeepError("Could not locate an .icns icon file for this app")
 
@@ -154,14 +319,25 @@ def slug_for(app_path: Path, bundle_id: str | None) -> str:
 
 def write_manifest(record: BackupRecord) -> None:
     manifest_path = Path(record.backup_path).parent / "manifest.json"
-    manifest_path.parent.mkdir(parents=True, exist_ok=True)
-    with manifest_path.open("w", encoding="utf-8") as handle:
-        json.dump(asdict(record), handle, indent=2, sort_keys=True)
+    payload = json.dumps(
+        {name: getattr(record, name) for name in _RECORD_FIELDS}, indent=2, sort_keys=True
+    ).encode("utf-8")
+    tmp_path = manifest_path.with_name(
+        f".{manifest_path.name}.{os.getpid()}.{threading.get_ident()}"
+    )
+    try:
+        with open(tmp_path, "wb") as handle:
+            handle.write(payload)
+        os.replace(tmp_path, manifest_path)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    _PATH_EXISTS[os.fspath(manifest_path)] = True
 
 
 def load_manifest(paths: Iterable[Path]) -> BackupRecord:
     for path in paths:
-        if path.exists():
+        if _exists(path):
             with path.open("r", encoding="utf-8") as handle:
                 data = json.load(handle)
             return BackupRecord(**data)
@@ -169,6 +345,8 @@ def load_manifest(paths: Iterable[Path]) -> BackupRecord:
 
 
 def backup(app_name: str) -> None:
+    from datetime import datetime
+
     app_path = find_app_bundle(app_name)
     info = read_info_plist(app_path)
     bundle_id = info.get("CFBundleIdentifier")
@@ -177,10 +355,10 @@ def backup(app_name: str) -> None:
 
     slug = slug_for(app_path, bundle_id)
     backup_root = data_dir() / slug
-    backup_root.mkdir(parents=True, exist_ok=True)
+    _ensure_dir(backup_root)
     backup_icon_path = backup_root / "icon.icns"
 
-    shutil.copy2(icon_path, backup_icon_path)
+    shutil.copyfile(icon_path, backup_icon_path)
 
     record = BackupRecord(
         app_path=str(app_path),
@@ -192,7 +370,7 @@ def backup(app_name: str) -> None:
     )
     write_manifest(record)
 
-    print(f"Backed up icon for {display_name} -> {backup_icon_path}")
+    _emit(f"Backed up icon for {display_name} -> {backup_icon_path}")
 
 
 def restore(app_name: str) -> None:
@@ -213,12 +391,36 @@ def restore(app_name: str) -> None:
 
     icon_target = app_path / manifest.icon_relpath
     icon_target.parent.mkdir(parents=True, exist_ok=True)
-    shutil.copy2(backup_icon_path, icon_target)
+    shutil.copyfile(backup_icon_path, icon_target)
+
+    _emit(f"Restored icon for {manifest.display_name} -> {icon_target}")
 
-    print(f"Restored icon for {manifest.display_name} -> {icon_target}")
+
+def run_batch(action: Callable[[str], None], apps: list[str]) -> None:
+    from concurrent.futures import ThreadPoolExecutor
+
+    max_workers = min(32, (os.cpu_count() or 1) * 4, len(apps))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [(app, executor.submit(action, app)) for app in apps]
+
+    failures = []
+    for app, future in futures:
+        try:
+            future.result()
+        except IconkeepError as exc:
+            failures.append((app, exc))
+    if failures:
+        for app, exc in failures:
+            _emit(f"Error: {app}: {exc}", file=sys.stderr)
+        sys.exit(1)
+
+
+COMMANDS: dict[str, Callable[[str], None]] = {"backup": backup, "restore": restore}
 
 
 def build_parser() -> argparse.ArgumentParser:
+    import argparse
+
     parser = argparse.ArgumentParser(
         prog="iconkeep",
         description="Back up and restore macOS application icons.",
@@ -242,41 +444,32 @@ def build_parser() -> argparse.ArgumentParser:
     return parser
 
 
+def parse_args(argv: list[str]) -> tuple[str, str | None]:
+    if (
+        argv
+        and argv[0] in COMMANDS
+        and len(argv) <= 2
+        and not any(arg.startswith("-") for arg in argv[1:])
+    ):
+        return argv[0], argv[1] if len(argv) == 2 else None
+
+    args = build_parser().parse_args(argv)
+    return args.command, args.app
+
+
 def main() -> None:
-    parser = build_parser()
-    args = parser.parse_args()
+    command, app = parse_args(sys.argv[1:])
+    action = COMMANDS[command]
 
     try:
-        if args.command == "backup":
-            if args.app:
-                backup(args.app)
-            else:
-                failures = []
-                for app in load_app_list():
-                    try:
-                        backup(app)
-                    except IconkeepError as exc:
-                        failures.append((app, exc))
-                if failures:
-                    for app, exc in failures:
-                        print(f"Error: {app}: {exc}", file=sys.stderr)
-                    sys.exit(1)
-        elif args.command == "restore":
-            if args.app:
-                restore(args.app)
-            else:
-                failures = []
-                for app in load_app_list():
-                    try:
-                        restore(app)
-                    except IconkeepError as exc:
-                        failures.append((app, exc))
-                if failures:
-                    for app, exc in failures:
-                        print(f"Error: {app}: {exc}", file=sys.stderr)
-                    sys.exit(1)
+        if app:
+            action(app)
         else:
-            parser.error("Unknown command")
+            apps = load_app_list()
+            if action is backup:
+                data_dir().mkdir(parents=True, exist_ok=True)
+            _app_index()
+            run_batch(action, apps)
     except IconkeepError as exc:
         print(f"Error: {exc}", file=sys.stderr)
         sys.exit(1)
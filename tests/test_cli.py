@@ -0,0 +1,52 @@
+import plistlib
+import tempfile
+import unittest
+from pathlib import Path
+
+from iconkeep import cli
+
+INFO = {
+    "CFBundleIdentifier": "com.example.Straße",
+    "CFBundleName": "Exämple " * 20,
+    "CFBundleIconFile": "AppIcon",
+    "CFBundleIconFiles": ["AppIcon", "Icon-60", ""],
+    "CFBundleIcons": {
+        "CFBundlePrimaryIcon": {
+            "CFBundleIconFiles": ["Primary"],
+            "UIPrerenderedIcon": False,
+            "Count": 2**40,
+            "Negative": -3,
+        }
+    },
+    "LSMinimumSystemVersion": "12.0",
+    "CFBundleDocumentTypes": [{"CFBundleTypeName": "Doc", "Rank": 1.5, "Data": b"\x00"}],
+}
+
+
+class ReadBplistKeysTest(unittest.TestCase):
+    def test_matches_plistlib(self):
+        for extra in (0, 20, 400):
+            info = dict(INFO, **{f"Key{i}": [i, str(i) * i] for i in range(extra)})
+            data = plistlib.dumps(info, fmt=plistlib.FMT_BINARY)
+            expected = {key: info[key] for key in cli.INFO_PLIST_KEYS}
+            self.assertEqual(cli._read_bplist_keys(data, cli.INFO_PLIST_KEYS), expected)
+
+    def test_rejects_non_dict_root(self):
+        data = plistlib.dumps(["CFBundleIdentifier"], fmt=plistlib.FMT_BINARY)
+        with self.assertRaises(ValueError):
+            cli._read_bplist_keys(data, cli.INFO_PLIST_KEYS)
+
+
+class ReadInfoPlistTest(unittest.TestCase):
+    def test_same_keys_for_binary_and_xml(self):
+        expected = {key: INFO[key] for key in cli.INFO_PLIST_KEYS}
+        for fmt in (plistlib.FMT_BINARY, plistlib.FMT_XML):
+            with tempfile.TemporaryDirectory() as tmp:
+                app_path = Path(tmp) / "Example.app"
+                (app_path / "Contents").mkdir(parents=True)
+                (app_path / "Contents" / "Info.plist").write_bytes(plistlib.dumps(INFO, fmt=fmt))
+                self.assertEqual(cli.read_info_plist(app_path), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()